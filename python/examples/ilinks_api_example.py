@@ -62,7 +62,7 @@ def main():
     updated_links = []
 
     def read_updated(link):
-        updated_links.append(link)
+        updated_links.append(link._asdict())
         return constants.CONTINUE
 
     links.each([link1_id, constants.ANY.value, constants.ANY.value], read_updated)
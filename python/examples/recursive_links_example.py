@@ -38,12 +38,12 @@ def main():
     print(f"Links notation with refs: {notation2}")
     print("Expected: (1: 1 (2: 5 6) 3 4)")
 
-    # Example 3: Parse Links notation
+    # Example 3: Parse Links notation (static, no database needed)
     print("\n--- Example 3: Parse Links Notation ---")
     links_notation = "((1 2) (3 4))"
     print(f"Parsing notation: {links_notation}")
 
-    parsed = recursive_links.parse_links_notation(links_notation)
+    parsed = RecursiveLinks.parse_links_notation(links_notation)
     print(f"Parsed result: {json.dumps(parsed)}")
 
     # Example 4: Round-trip conversion
@@ -51,10 +51,10 @@ def main():
     original = [[7, 8], [9, 10]]
     print(f"Original list: {json.dumps(original)}")
 
-    to_notation = recursive_links.to_links_notation(original)
+    to_notation = RecursiveLinks.to_links_notation(original)
     print(f"To notation: {to_notation}")
 
-    back_to_list = recursive_links.parse_links_notation(to_notation)
+    back_to_list = RecursiveLinks.parse_links_notation(to_notation)
     print(f"Back to list: {json.dumps(back_to_list)}")
     print(f"Match: {original == back_to_list}")
 
@@ -1,18 +1,408 @@
 """ILinks - Universal flat API compatible with Platform.Data ILinks interface"""
 
-from typing import List, Optional, Callable, Dict, Any
-from enum import Enum
+from collections import defaultdict
+from typing import (
+    List, Optional, Callable, Collection, Dict, Any, Iterable, Iterator, NamedTuple, Set, Tuple, Type, Union
+)
+from enum import IntEnum
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, filtering falls back to pure Python
+    np = None
+
 from links_client.services.link_db_service import LinkDBService
 from links_client.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Minimum number of links to scan before filtering switches to NumPy
+NUMPY_THRESHOLD = 1000
+
+# Minimum number of links before vectorized filtering uses Numba kernels
+NUMBA_THRESHOLD = 10_000
+
+# Share of the cache the smallest index bucket must reach before masking the
+# whole link columns beats filtering the bucket in Python
+VECTORIZE_SHARE = 0.05
+
+# dtype of the parallel id/source/target columns used for vectorized filtering;
+# link-cli addresses are unsigned 64-bit integers
+LINK_COLUMN_DTYPE = "u8"
+
+
+class Link(NamedTuple):
+    """A cached link; each() handlers receive it directly"""
+    id: int
+    source: int
+    target: int
+
+    def __getitem__(self, key):
+        """
+        Index by position, or by field name like the dicts handlers used to get
+
+        Raises:
+            KeyError: If key is a string other than a field name
+        """
+        if type(key) is str:
+            if key not in self._fields:
+                raise KeyError(key)
+            return getattr(self, key)
+        return tuple.__getitem__(self, key)
+
+    def __contains__(self, item) -> bool:
+        """Check for a field name, or for a value when item is not a string"""
+        if type(item) is str:
+            return item in self._fields
+        return tuple.__contains__(self, item)
+
+    def keys(self) -> Tuple[str, ...]:
+        """Field names, so dict(link) builds the same dict as _asdict()"""
+        return self._fields
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Value of field key, or default if there is no such field"""
+        if key in self._fields:
+            return getattr(self, key)
+        return default
+
+
+# Filters specialized by which of (id, source, target) are ANY. Each takes the
+# restriction literals as arguments, so matching a link never checks for ANY
+# or indexes into the restriction.
+_SPECIALIZED: Dict[
+    Tuple[bool, bool, bool],
+    Callable[[Iterable[Link], int, int, int], Iterator[Link]]
+] = {
+    (True, True, True): lambda links, i, s, t: iter(links),
+    (False, True, True): lambda links, i, s, t: (l for l in links if l.id == i),
+    (True, False, True): lambda links, i, s, t: (l for l in links if l.source == s),
+    (True, True, False): lambda links, i, s, t: (l for l in links if l.target == t),
+    (False, False, True): lambda links, i, s, t: (
+        l for l in links if l.id == i and l.source == s
+    ),
+    (False, True, False): lambda links, i, s, t: (
+        l for l in links if l.id == i and l.target == t
+    ),
+    (True, False, False): lambda links, i, s, t: (
+        l for l in links if l.source == s and l.target == t
+    ),
+    (False, False, False): lambda links, i, s, t: (
+        l for l in links if l.id == i and l.source == s and l.target == t
+    ),
+}
+
+
+def _restriction_fields(restriction: List[int]) -> Tuple[str, ...]:
+    """
+    Get the link fields addressed by each position of a restriction
+
+    Args:
+        restriction: [id], [source, target] or [id, source, target]
+
+    Returns:
+        Field names in restriction order
+    """
+    if len(restriction) == 1:
+        return ("id",)
+    if len(restriction) == 2:
+        return ("source", "target")
+    return ("id", "source", "target")
+
+
+def _restriction_values(restriction: List[int], any_value: int) -> Tuple[int, int, int]:
+    """
+    Expand a restriction to explicit (id, source, target) values
+
+    Args:
+        restriction: [id], [source, target] or [id, source, target]
+        any_value: Value used for positions the restriction leaves out
+
+    Returns:
+        (id, source, target) with any_value for unrestricted fields
+    """
+    values = dict(zip(_restriction_fields(restriction), restriction))
+    return (
+        values.get("id", any_value),
+        values.get("source", any_value),
+        values.get("target", any_value)
+    )
+
+
+# Numba kernels in plain Python form; they run only after _jit_kernels() compiles them
+def _match_mask(ids, sources, targets, link_id, source, target, any_value):
+    """Boolean mask of links matching (link_id, source, target)"""
+    mask = np.empty(ids.shape[0], dtype=np.bool_)
+    for i in range(ids.shape[0]):
+        mask[i] = (
+            (link_id == any_value or ids[i] == link_id) and
+            (source == any_value or sources[i] == source) and
+            (target == any_value or targets[i] == target)
+        )
+    return mask
+
+
+def _scan_indices(ids, sources, targets, link_id, source, target, any_value):
+    """Indices of links matching (link_id, source, target), in order"""
+    hits = np.empty(ids.shape[0], dtype=np.int64)
+    count = 0
+    for i in range(ids.shape[0]):
+        if ((link_id == any_value or ids[i] == link_id) and
+                (source == any_value or sources[i] == source) and
+                (target == any_value or targets[i] == target)):
+            hits[count] = i
+            count += 1
+    return hits[:count]
+
+
+def _find_first_index(ids, sources, targets, link_id, source, target, any_value):
+    """Index of the first link matching (link_id, source, target), or -1"""
+    for i in range(ids.shape[0]):
+        if ((link_id == any_value or ids[i] == link_id) and
+                (source == any_value or sources[i] == source) and
+                (target == any_value or targets[i] == target)):
+            return i
+    return -1
+
+
+class _JitKernels(NamedTuple):
+    """Numba-compiled versions of the filtering kernels"""
+    match_mask: Callable
+    scan_indices: Callable
+    find_first_index: Callable
+
+
+# None until the first large scan; False when Numba is not installed
+_jit_kernels_cache: Any = None
+
+
+def _jit_kernels() -> Optional[_JitKernels]:
+    """
+    Import Numba and compile the filtering kernels on first use
+
+    Importing Numba is slow, so it is deferred until a scan is large enough
+    to use it rather than done when this module is imported.
+
+    Returns:
+        Compiled kernels, or None if Numba is not installed
+    """
+    global _jit_kernels_cache
+    if _jit_kernels_cache is None:
+        try:
+            from numba import njit
+        except ImportError:  # Numba is optional, NumPy masks are used without it
+            _jit_kernels_cache = False
+        else:
+            _jit_kernels_cache = _JitKernels(
+                *(njit(cache=True)(kernel)
+                  for kernel in (_match_mask, _scan_indices, _find_first_index))
+            )
+    return _jit_kernels_cache or None
+
+
+def _add_to_bucket(
+    buckets: Dict[int, Dict[int, Link]],
+    unsorted: Set[int],
+    key: int,
+    link: Link
+) -> None:
+    """
+    Add a link to a source or target index bucket
+
+    Buckets keep links in id order, like the database listing. Appending a
+    link with a lower id than the bucket's last one marks the bucket for a
+    re-sort on its next read instead of sorting it on every write.
+
+    Args:
+        buckets: Index of link buckets by source or target
+        unsorted: Keys of buckets whose links are out of id order
+        key: Bucket key of the link
+        link: Link to add
+    """
+    bucket = buckets[key]
+    if bucket and next(reversed(bucket)) > link.id:
+        unsorted.add(key)
+    bucket[link.id] = link
+
+
+def _get_bucket(
+    buckets: Dict[int, Dict[int, Link]],
+    unsorted: Set[int],
+    key: int
+) -> Optional[Dict[int, Link]]:
+    """
+    Get a source or target index bucket with its links in id order
+
+    Args:
+        buckets: Index of link buckets by source or target
+        unsorted: Keys of buckets whose links are out of id order
+        key: Bucket key
+
+    Returns:
+        Bucket mapping link id to link, or None if there is none for key
+    """
+    bucket = buckets.get(key)
+    if bucket is not None and key in unsorted:
+        bucket = buckets[key] = dict(sorted(bucket.items()))
+        unsorted.discard(key)
+    return bucket
+
+
+def _remove_from_bucket(
+    buckets: Dict[int, Dict[int, Link]],
+    unsorted: Set[int],
+    key: int,
+    link: Link
+) -> None:
+    """
+    Remove a link from a source or target index bucket, dropping it once empty
+
+    Args:
+        buckets: Index of link buckets by source or target
+        unsorted: Keys of buckets whose links are out of id order
+        key: Bucket key of the link
+        link: Link to remove
+    """
+    bucket = buckets[key]
+    del bucket[link.id]
+    if not bucket:
+        # Keep the indexes from growing under create/delete churn
+        del buckets[key]
+        unsorted.discard(key)
+
+
+def _rebucket(
+    buckets: Dict[int, Dict[int, Link]],
+    unsorted: Set[int],
+    old_key: int,
+    new_key: int,
+    link: Link
+) -> None:
+    """
+    Move a link between source or target index buckets after an update
+
+    Args:
+        buckets: Index of link buckets by source or target
+        unsorted: Keys of buckets whose links are out of id order
+        old_key: Bucket key of the link before the update
+        new_key: Bucket key of the updated link
+        link: Updated link
+    """
+    if old_key == new_key:
+        # Reassigning keeps the link's position in its bucket
+        buckets[new_key][link.id] = link
+        return
+    _remove_from_bucket(buckets, unsorted, old_key, link)
+    _add_to_bucket(buckets, unsorted, new_key, link)
+
+
+class _LinkColumns:
+    """
+    Parallel id/source/target NumPy columns mirroring the cached links
+
+    Rows are kept in id order and changed in place by the cache's write
+    paths, so a write never rebuilds the columns for the whole cache.
+    Building or writing a link with a value outside uint64 raises
+    OverflowError before the columns change.
+    """
+
+    def __init__(self, links: List[Link]):
+        """
+        Build the columns from links
+
+        Args:
+            links: Cached links in id order
+
+        Raises:
+            OverflowError: If a link value does not fit in LINK_COLUMN_DTYPE
+        """
+        rows = np.array(links, dtype=LINK_COLUMN_DTYPE).reshape(-1, 3)
+        # One row per field, so each column is a contiguous slice
+        self._data = np.ascontiguousarray(rows.T)
+        self.size = len(links)
 
-class LinkConstants(Enum):
+    @property
+    def columns(self) -> Tuple[Any, Any, Any]:
+        """
+        Read-only (ids, sources, targets) views of the used rows
+
+        Returns:
+            Views that later writes may change; copy them to keep a snapshot
+        """
+        columns = tuple(self._data[field, :self.size] for field in range(3))
+        for column in columns:
+            column.flags.writeable = False
+        return columns
+
+    def _position(self, link_id: int) -> int:
+        """
+        Find where link_id is or would be in the id column
+
+        Args:
+            link_id: Link id
+
+        Returns:
+            Row position keeping the ids sorted
+        """
+        return int(np.searchsorted(self._data[0, :self.size], link_id))
+
+    def insert(self, link: Link) -> None:
+        """
+        Add a link at its id position, growing the buffer geometrically
+
+        Args:
+            link: Link not yet in the columns
+        """
+        # Converting first raises OverflowError before anything is shifted
+        row = np.array(link, dtype=LINK_COLUMN_DTYPE)
+        size = self.size
+        if size == self._data.shape[1]:
+            data = np.empty((3, max(2 * size, 16)), dtype=LINK_COLUMN_DTYPE)
+            data[:, :size] = self._data[:, :size]
+            self._data = data
+        # New links usually have the highest id, which needs no shift
+        position = self._position(link.id)
+        if position < size:
+            self._data[:, position + 1:size + 1] = self._data[:, position:size]
+        self._data[:, position] = row
+        self.size = size + 1
+
+    def replace(self, link: Link) -> None:
+        """
+        Overwrite the row of a link that keeps its id
+
+        Args:
+            link: Updated link
+        """
+        row = np.array(link, dtype=LINK_COLUMN_DTYPE)
+        self._data[:, self._position(link.id)] = row
+
+    def remove(self, link: Link) -> None:
+        """
+        Drop the row of a link
+
+        Args:
+            link: Link in the columns
+        """
+        position = self._position(link.id)
+        self._data[:, position:self.size - 1] = self._data[:, position + 1:self.size]
+        self.size -= 1
+
+
+class _Break(BaseException):
+    """
+    Raised by ILinks.brk() inside an each() handler to stop iteration
+
+    Like GeneratorExit, this derives from BaseException so a handler's own
+    ``except Exception`` cannot swallow it.
+    """
+
+
+class LinkConstants(IntEnum):
     """Constants for ILinks operations"""
-    CONTINUE = "continue"
-    BREAK = "break"
     ANY = 0  # Use 0 to represent "any" in restrictions
+    CONTINUE = 1
+    BREAK = 2
 
 
 class ILinks:
@@ -30,18 +420,82 @@ class ILinks:
         Args:
             db_path: Path to database file
         """
-        self.db = LinkDBService(db_path)
+        self._db_path = db_path
+        self._db: Optional[LinkDBService] = None
         self.constants = LinkConstants
+        # Plain int for ANY, compared against every restriction field
+        self._ANY = LinkConstants.ANY.value
+        # Links read from the database, kept in sync by create/update/delete;
+        # _by_id is the primary store, ordered by id like the database listing
+        self._by_id: Dict[int, Link] = {}
+        # Set when a created link's id is lower than the last one in _by_id
+        self._ids_unsorted = False
+        self._cache_dirty = True
+        # List snapshot of _by_id values, rebuilt on demand after changes
+        self._links_cache: Optional[List[Link]] = None
+        # Indexes over the cached links by source and target
+        # Each bucket maps link id to link, so removing one is O(1)
+        self._by_source: Dict[int, Dict[int, Link]] = defaultdict(dict)
+        self._by_target: Dict[int, Dict[int, Link]] = defaultdict(dict)
+        # Keys of source and target buckets to re-sort by id on their next read
+        self._unsorted_sources: Set[int] = set()
+        self._unsorted_targets: Set[int] = set()
+        # Parallel id/source/target column mirror of the cache, built on demand
+        # with NumPy and then kept in sync with it; False once a link value
+        # does not fit in the columns, until the cache is invalidated
+        self._link_columns: Union[_LinkColumns, bool, None] = None
+
+    @property
+    def db(self) -> LinkDBService:
+        """
+        Database service, created on first database access
+
+        Returns:
+            LinkDBService instance
+        """
+        if self._db is None:
+            self._db = LinkDBService(self._db_path)
+        return self._db
+
+    @db.setter
+    def db(self, db: LinkDBService) -> None:
+        self._db = db
 
-    def get_constants(self) -> LinkConstants:
+    def get_constants(self) -> Type[LinkConstants]:
         """
         Get constants for this Links instance
 
         Returns:
-            Constants enum
+            The LinkConstants enum class itself (no copy is made)
         """
         return self.constants
 
+    @staticmethod
+    def brk() -> None:
+        """
+        Stop the each() call whose handler calls this, making it return BREAK
+
+        Raises:
+            _Break: Always; each() catches it
+        """
+        raise _Break()
+
+    def invalidate_cache(self) -> None:
+        """
+        Drop cached links so the next operation re-reads the database
+
+        Call this when the database may have been changed by another client.
+        """
+        self._links_cache = None
+        self._cache_dirty = True
+        self._by_id = {}
+        self._ids_unsorted = False
+        self._by_source = defaultdict(dict)
+        self._by_target = defaultdict(dict)
+        self._unsorted_sources = set()
+        self._unsorted_targets = set()
+        self._link_columns = None
+
     def count(self, restriction: Optional[List[int]] = None) -> int:
         """
         Count links matching the restriction
@@ -53,14 +507,19 @@ class ILinks:
             Number of matching links
         """
         try:
-            all_links = self.db.read_all_links()
-
             if not restriction:
-                return len(all_links)
+                # Counting needs the same full listing as loading, so keep it
+                self._load_links()
+                return len(self._by_id)
 
             # Filter based on restriction
-            filtered = self._filter_links(all_links, restriction)
-            return len(filtered)
+            candidates, exact = self._candidate_links(restriction)
+            if candidates is None:
+                return int(np.count_nonzero(self._filter_mask(restriction)))
+            if exact:
+                return len(candidates)
+
+            return sum(1 for _ in self._match(candidates, restriction))
         except Exception as error:
             logger.error(f"Failed to count links: {error}")
             raise
@@ -68,35 +527,122 @@ class ILinks:
     def each(
         self,
         restriction: Optional[List[int]] = None,
-        handler: Optional[Callable[[Dict[str, int]], LinkConstants]] = None
+        handler: Optional[Callable[[Link], LinkConstants]] = None
     ) -> LinkConstants:
         """
         Iterate through links matching restriction, calling handler for each
 
         Args:
             restriction: List to filter links, None for all
-            handler: Callback function(link) that returns CONTINUE or BREAK
+            handler: Callback function(link) receiving a Link named tuple rather
+                than a dict. It supports link["source"], link.get("source"),
+                "source" in link and dict(link) as well as link.source, but it
+                is still a tuple: iterating it yields values, json.dumps()
+                writes a list, and other dict methods are missing, so use
+                link._asdict() where a real dict is needed. Iteration stops
+                when it calls ILinks.brk() or returns LinkConstants.BREAK (or
+                its value, 2), and continues for any other return value,
+                including None
 
         Returns:
             CONTINUE if completed, BREAK if interrupted
         """
         try:
-            all_links = self.db.read_all_links()
-            filtered = self._filter_links(all_links, restriction)
-
             if not handler:
                 return self.constants.CONTINUE
 
-            for link in filtered:
-                result = handler(link)
-                if result == self.constants.BREAK:
-                    return self.constants.BREAK
+            # Links are matched lazily so BREAK stops the scan early
+            BREAK = self.constants.BREAK
+            try:
+                for link in self._iter_filtered(restriction):
+                    if handler(link) == BREAK:
+                        return BREAK
+            except _Break:
+                return BREAK
 
             return self.constants.CONTINUE
         except Exception as error:
             logger.error(f"Failed to iterate links: {error}")
             raise
 
+    def collect(self, restriction: Optional[List[int]] = None) -> List[Link]:
+        """
+        Collect links matching restriction as Link tuples
+
+        Args:
+            restriction: List to filter links, None for all
+
+        Returns:
+            Matching links, in the same order each() visits them
+        """
+        try:
+            return list(self._iter_filtered(restriction))
+        except Exception as error:
+            logger.error(f"Failed to collect links: {error}")
+            raise
+
+    def each_collect(self, restriction: Optional[List[int]] = None) -> List[Dict[str, int]]:
+        """
+        Collect links matching restriction without a per-link handler call
+
+        Args:
+            restriction: List to filter links, None for all
+
+        Returns:
+            Matching links as dicts, in the same order each() visits them
+        """
+        try:
+            # The restriction is applied first, so dicts are built only for matches
+            return [link._asdict() for link in self._iter_filtered(restriction)]
+        except Exception as error:
+            logger.error(f"Failed to collect links: {error}")
+            raise
+
+    def each_rows(self, restriction: Optional[List[int]] = None) -> Tuple[Any, Any, Any]:
+        """
+        Get links matching restriction as parallel id, source and target columns
+
+        Args:
+            restriction: List to filter links, None for all
+
+        Returns:
+            (ids, sources, targets); new uint64 NumPy arrays owned by the
+            caller when NumPy is installed and every value fits, otherwise
+            lists
+        """
+        try:
+            links = None
+            if np is not None:
+                if not restriction:
+                    columns = self._get_link_columns()
+                    if columns is not None:
+                        # The columns change with the cache, so hand out a copy
+                        return tuple(column.copy() for column in columns)
+                else:
+                    candidates, _ = self._candidate_links(restriction)
+                    if candidates is None:
+                        mask = self._filter_mask(restriction)
+                        return tuple(column[mask] for column in self._get_link_columns())
+
+                    # Few candidates: skip building columns for the whole cache
+                    links = list(self._match(candidates, restriction))
+                    try:
+                        rows = np.array(links, dtype=LINK_COLUMN_DTYPE).reshape(-1, 3)
+                        return tuple(np.ascontiguousarray(rows[:, field]) for field in range(3))
+                    except OverflowError:
+                        pass  # Values outside uint64 are returned as lists
+
+            if links is None:
+                links = list(self._iter_filtered(restriction))
+            return (
+                [link.id for link in links],
+                [link.source for link in links],
+                [link.target for link in links]
+            )
+        except Exception as error:
+            logger.error(f"Failed to read link rows: {error}")
+            raise
+
     def create(
         self,
         substitution: Optional[List[int]] = None,
@@ -117,16 +663,56 @@ class ILinks:
                 raise ValueError("Substitution must contain at least [source, target]")
 
             source, target = substitution[0], substitution[1]
-            link = self.db.create_link(source, target)
+            link = Link(**self._write(self.db.create_link, source, target))
+
+            if not self._cache_dirty:
+                self._index_link(link)
 
             if handler:
-                handler({"before": None, "after": link})
+                handler({"before": None, "after": link._asdict()})
 
-            return link["id"]
+            return link.id
         except Exception as error:
             logger.error(f"Failed to create link: {error}")
             raise
 
+    def create_many(
+        self,
+        substitutions: List[List[int]],
+        handler: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> List[int]:
+        """
+        Create several links using batched database queries
+
+        Args:
+            substitutions: List of [source, target] or [id, source, target]
+            handler: Callback function called once per created link
+
+        Returns:
+            Created link IDs in the same order as substitutions
+        """
+        try:
+            pairs = []
+            for substitution in substitutions:
+                if not substitution or len(substitution) < 2:
+                    raise ValueError("Substitution must contain at least [source, target]")
+                pairs.append((substitution[0], substitution[1]))
+
+            created = [Link(**link) for link in self._write(self.db.create_links_batch, pairs)]
+
+            if not self._cache_dirty:
+                for link in created:
+                    self._index_link(link)
+
+            if handler:
+                for link in created:
+                    handler({"before": None, "after": link._asdict()})
+
+            return [link.id for link in created]
+        except Exception as error:
+            logger.error(f"Failed to create links: {error}")
+            raise
+
     def update(
         self,
         restriction: Optional[List[int]] = None,
@@ -150,30 +736,30 @@ class ILinks:
             if not substitution or len(substitution) < 2:
                 raise ValueError("Substitution must contain at least [source, target]")
 
-            all_links = self.db.read_all_links()
-            filtered = self._filter_links(all_links, restriction)
+            # Update first matching link
+            link_to_update = self._find_first(restriction)
 
-            if not filtered:
+            if link_to_update is None:
                 raise ValueError("No links found matching restriction")
-
-            # Update first matching link
-            link_to_update = filtered[0]
             new_source, new_target = (
                 substitution if len(substitution) == 2
                 else (substitution[1], substitution[2])
             )
 
-            before = dict(link_to_update)
-            updated = self.db.update_link(
-                link_to_update["id"],
+            updated = Link(**self._write(
+                self.db.update_link,
+                link_to_update.id,
                 new_source,
                 new_target
-            )
+            ))
+
+            # Cached links are immutable, so replace the old one in place
+            self._replace_link(link_to_update, updated)
 
             if handler:
-                handler({"before": before, "after": updated})
+                handler({"before": link_to_update._asdict(), "after": updated._asdict()})
 
-            return updated["id"]
+            return updated.id
         except Exception as error:
             logger.error(f"Failed to update link: {error}")
             raise
@@ -197,59 +783,358 @@ class ILinks:
             if not restriction:
                 raise ValueError("Restriction required for delete")
 
-            all_links = self.db.read_all_links()
-            filtered = self._filter_links(all_links, restriction)
+            # Delete first matching link
+            link_to_delete = self._find_first(restriction)
 
-            if not filtered:
+            if link_to_delete is None:
                 raise ValueError("No links found matching restriction")
-
-            # Delete first matching link
-            link_to_delete = filtered[0]
-            before = dict(link_to_delete)
-            self.db.delete_link(link_to_delete["id"])
+            self._write(self.db.delete_link, link_to_delete.id)
+            self._unindex_link(link_to_delete)
 
             if handler:
-                handler({"before": before, "after": None})
+                handler({"before": link_to_delete._asdict(), "after": None})
 
-            return link_to_delete["id"]
+            return link_to_delete.id
         except Exception as error:
             logger.error(f"Failed to delete link: {error}")
             raise
 
+    def _write(self, write: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run a database write, dropping the cache if it fails
+
+        A failed write may still have reached the database: create_links_batch
+        commits earlier batches, and create_link may write before its output
+        fails to parse. Errors raised before calling this leave the cache warm.
+
+        Args:
+            write: LinkDBService method to call
+            *args: Arguments for write
+
+        Returns:
+            Result of write
+        """
+        try:
+            return write(*args)
+        except Exception:
+            self.invalidate_cache()
+            raise
+
+    def _load_links(self) -> None:
+        """
+        Read all links from the database into the cache if it is stale
+        """
+        if self._cache_dirty:
+            links = [Link._make(link) for link in self.db.read_all_link_tuples()]
+            self._cache_dirty = False
+            self._by_id = {}
+            self._ids_unsorted = False
+            self._by_source = defaultdict(dict)
+            self._by_target = defaultdict(dict)
+            self._unsorted_sources = set()
+            self._unsorted_targets = set()
+            for link in links:
+                self._index_link(link)
+
+    def _get_all_links(self) -> List[Link]:
+        """
+        Get all links, reading the database only when the cache is stale
+
+        Returns:
+            All links
+        """
+        self._load_links()
+        if self._links_cache is None:
+            if self._ids_unsorted:
+                self._by_id = dict(sorted(self._by_id.items()))
+                self._ids_unsorted = False
+            self._links_cache = list(self._by_id.values())
+        return self._links_cache
+
+    def _index_link(self, link: Link) -> None:
+        """
+        Add a cached link to the id/source/target indexes
+
+        Args:
+            link: Cached link
+        """
+        if link.id in self._by_id:
+            # clink returns the existing link for a repeated identical pair
+            return
+        if self._by_id and next(reversed(self._by_id)) > link.id:
+            # clink may reuse the id of a deleted link
+            self._ids_unsorted = True
+        self._by_id[link.id] = link
+        self._links_cache = None
+        self._sync_columns(_LinkColumns.insert, link)
+        _add_to_bucket(self._by_source, self._unsorted_sources, link.source, link)
+        _add_to_bucket(self._by_target, self._unsorted_targets, link.target, link)
+
+    def _unindex_link(self, link: Link) -> None:
+        """
+        Remove a cached link from the id/source/target indexes
+
+        Args:
+            link: Cached link
+        """
+        del self._by_id[link.id]
+        self._links_cache = None
+        self._sync_columns(_LinkColumns.remove, link)
+        _remove_from_bucket(self._by_source, self._unsorted_sources, link.source, link)
+        _remove_from_bucket(self._by_target, self._unsorted_targets, link.target, link)
+
+    def _replace_link(self, old: Link, new: Link) -> None:
+        """
+        Replace a cached link with its updated version, keeping its position
+
+        Args:
+            old: Cached link
+            new: Updated link with the same id
+        """
+        # Assigning an existing key keeps its place in the ordered store
+        self._by_id[new.id] = new
+        self._links_cache = None
+        self._sync_columns(_LinkColumns.replace, new)
+        _rebucket(self._by_source, self._unsorted_sources, old.source, new.source, new)
+        _rebucket(self._by_target, self._unsorted_targets, old.target, new.target, new)
+
+    def _candidate_links(
+        self,
+        restriction: List[int]
+    ) -> Tuple[Optional[Collection[Link]], bool]:
+        """
+        Narrow the links to scan using the most selective index for restriction
+
+        Args:
+            restriction: Restriction list
+
+        Returns:
+            (candidates, exact): the links that may match, or None when
+            masking the link columns is cheaper than filtering the smallest
+            index bucket; exact is True when every candidate matches
+        """
+        # Index lookups leave the list snapshot alone, so they stay O(1) after changes
+        self._load_links()
+        any_value = self._ANY
+        link_id, source, target = _restriction_values(restriction, any_value)
+
+        if link_id != any_value:
+            link = self._by_id.get(link_id)
+            return ([link] if link is not None else []), False
+        if source == any_value and target == any_value:
+            return self._get_all_links(), True
+
+        buckets = []
+        if source != any_value:
+            buckets.append(_get_bucket(self._by_source, self._unsorted_sources, source) or {})
+        if target != any_value:
+            buckets.append(_get_bucket(self._by_target, self._unsorted_targets, target) or {})
+        bucket = min(buckets, key=len)
+        if len(buckets) == 1:
+            # A single restricted field is answered by its bucket alone
+            return bucket.values(), True
+        if bucket and self._should_vectorize(len(bucket)):
+            return None, False
+        return bucket.values(), False
+
     def _filter_links(
         self,
-        links: List[Dict[str, int]],
         restriction: Optional[List[int]]
-    ) -> List[Dict[str, int]]:
+    ) -> List[Link]:
         """
         Helper method to filter links based on restriction
 
         Args:
-            links: All links
             restriction: Restriction list
 
         Returns:
             Filtered links
         """
+        return list(self._iter_filtered(restriction))
+
+    def _iter_filtered(
+        self,
+        restriction: Optional[List[int]]
+    ) -> Iterator[Link]:
+        """
+        Lazily yield links matching restriction
+
+        Iterates over a snapshot of the candidate links, so callers may
+        create, update or delete links while consuming the iterator.
+
+        Args:
+            restriction: Restriction list
+
+        Yields:
+            Matching links
+        """
         if not restriction:
-            return links
-
-        filtered = []
-        for link in links:
-            if len(restriction) == 1:
-                # [id] - match by ID
-                if restriction[0] == self.constants.ANY.value or link["id"] == restriction[0]:
-                    filtered.append(link)
-            elif len(restriction) == 2:
-                # [source, target] - match by source and target
-                if ((restriction[0] == self.constants.ANY.value or link["source"] == restriction[0]) and
-                    (restriction[1] == self.constants.ANY.value or link["target"] == restriction[1])):
-                    filtered.append(link)
-            elif len(restriction) >= 3:
-                # [id, source, target] - match all three
-                if ((restriction[0] == self.constants.ANY.value or link["id"] == restriction[0]) and
-                    (restriction[1] == self.constants.ANY.value or link["source"] == restriction[1]) and
-                    (restriction[2] == self.constants.ANY.value or link["target"] == restriction[2])):
-                    filtered.append(link)
-
-        return filtered
+            yield from tuple(self._get_all_links())
+            return
+
+        candidates, _ = self._candidate_links(restriction)
+        if candidates is None:
+            # Resolve the hits up front so the snapshot survives later writes
+            ids = self._get_link_columns()[0][self._filter_indices(restriction)]
+            by_id = self._by_id
+            yield from [by_id[link_id] for link_id in ids.tolist()]
+            return
+
+        yield from self._match(tuple(candidates), restriction)
+
+    def _find_first(self, restriction: List[int]) -> Optional[Link]:
+        """
+        Find the first link matching restriction without scanning the rest
+
+        Args:
+            restriction: Restriction list
+
+        Returns:
+            First matching link or None
+        """
+        candidates, _ = self._candidate_links(restriction)
+        if candidates is None:
+            columns = self._get_link_columns()
+            if self._should_jit(columns[0]):
+                index = _jit_kernels().find_first_index(
+                    *columns, *self._column_values(restriction)
+                )
+            else:
+                mask = self._filter_mask(restriction)
+                index = int(mask.argmax()) if mask.any() else -1
+            return self._by_id[int(columns[0][index])] if index >= 0 else None
+
+        return next(self._match(candidates, restriction), None)
+
+    def _should_vectorize(self, bucket_size: int) -> bool:
+        """
+        Check whether masking all link columns beats filtering an index bucket
+
+        Args:
+            bucket_size: Number of links in the smallest matching bucket
+
+        Returns:
+            True if the link columns are available and the bucket is large
+            both on its own and as a share of the cache
+        """
+        return (
+            np is not None and
+            bucket_size >= NUMPY_THRESHOLD and
+            bucket_size >= VECTORIZE_SHARE * len(self._by_id) and
+            self._get_link_columns() is not None
+        )
+
+    def _should_jit(self, ids) -> bool:
+        """
+        Check whether the link columns are large enough to use the Numba kernels
+
+        Args:
+            ids: Link id column
+
+        Returns:
+            True if the columns are large enough and Numba is available
+        """
+        # The length check comes first so small caches never import Numba
+        return len(ids) >= NUMBA_THRESHOLD and _jit_kernels() is not None
+
+    def _get_link_columns(self):
+        """
+        Get cached links as parallel read-only NumPy columns
+
+        Returns:
+            (ids, sources, targets) arrays in id order, or None if a link
+            value does not fit in LINK_COLUMN_DTYPE
+        """
+        if self._link_columns is None:
+            try:
+                self._link_columns = _LinkColumns(self._get_all_links())
+            except OverflowError:
+                # Links outside uint64 are left to the Python scan
+                self._link_columns = False
+        return self._link_columns.columns if self._link_columns else None
+
+    def _sync_columns(self, write: Callable[[_LinkColumns, Link], None], link: Link) -> None:
+        """
+        Apply a cache write to the link columns if they have been built
+
+        Args:
+            write: _LinkColumns method applying the write
+            link: Link written
+        """
+        if self._link_columns:
+            try:
+                write(self._link_columns, link)
+            except OverflowError:
+                self._link_columns = False
+
+    def _column_values(self, restriction: List[int]):
+        """
+        Expand a restriction to scalars of the link column dtype
+
+        Python ints would make NumPy 1.x and Numba compare uint64 columns as
+        float64, which loses precision for large addresses.
+
+        Args:
+            restriction: Restriction list
+
+        Returns:
+            (id, source, target, any_value) as LINK_COLUMN_DTYPE scalars
+        """
+        any_value = self._ANY
+        dtype = np.dtype(LINK_COLUMN_DTYPE).type
+        return tuple(
+            dtype(value) for value in (*_restriction_values(restriction, any_value), any_value)
+        )
+
+    def _filter_mask(self, restriction: List[int]):
+        """
+        Build a boolean mask over the link columns for restriction
+
+        Args:
+            restriction: Restriction list
+
+        Returns:
+            Boolean ndarray, True for matching links
+        """
+        columns = self._get_link_columns()
+        *values, any_value = self._column_values(restriction)
+        if self._should_jit(columns[0]):
+            return _jit_kernels().match_mask(*columns, *values, any_value)
+
+        mask = np.ones(len(columns[0]), dtype=bool)
+        for column, value in zip(columns, values):
+            if value != any_value:
+                mask &= column == value
+        return mask
+
+    def _filter_indices(self, restriction: List[int]):
+        """
+        Get the positions of links matching restriction in the link columns
+
+        Args:
+            restriction: Restriction list
+
+        Returns:
+            int64 ndarray of matching positions in cache order
+        """
+        columns = self._get_link_columns()
+        if self._should_jit(columns[0]):
+            # Scan straight to hit positions without building a mask first
+            return _jit_kernels().scan_indices(*columns, *self._column_values(restriction))
+        return np.flatnonzero(self._filter_mask(restriction))
+
+    def _match(self, links: Iterable[Link], restriction: List[int]) -> Iterator[Link]:
+        """
+        Yield links matching restriction using the filter for its shape
+
+        Args:
+            links: Links to check
+            restriction: Restriction list
+
+        Returns:
+            Iterator over matching links
+        """
+        any_value = self._ANY
+        values = _restriction_values(restriction, any_value)
+        shape = (values[0] == any_value, values[1] == any_value, values[2] == any_value)
+        return _SPECIALIZED[shape](links, *values)
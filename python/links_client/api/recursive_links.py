@@ -1,11 +1,185 @@
 """RecursiveLinks - Recursive API wrapper for nested lists and dicts"""
 
-from typing import List, Dict, Any, Optional, Union
+import functools
+import re
+from typing import List, Dict, Any, Optional, Tuple, Union
 from links_client.api.ilinks import ILinks
 from links_client.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Maximum number of entries kept by each notation conversion cache
+NOTATION_CACHE_SIZE = 1024
+
+# Notation tokens: "(" is group 1, ")" is group 2 and an integer is group 3;
+# any other run (e.g. "1:" or "x4") matches no group and is skipped
+_NOTATION_TOKEN = re.compile(r'(\()|(\))|(-?\d+)(?![^()\s])|[^()\s]+')
+
+
+def _emit_notation(sequence: Any, out: List[str], sequence_type: type = list) -> None:
+    """
+    Append Links notation tokens for a sequence and its nested items to out
+
+    Args:
+        sequence: Sequence of values and nested sequences
+        out: Token accumulator
+        sequence_type: Type of items treated as nested sequences
+    """
+    out.append('(')
+    for position, item in enumerate(sequence):
+        if position:
+            out.append(' ')
+        if isinstance(item, sequence_type):
+            _emit_notation(item, out, sequence_type)
+        else:
+            out.append(str(item))
+    out.append(')')
+
+
+def _format_notation(nested: Any, sequence_type: type = list) -> str:
+    """
+    Convert a nested sequence to Links notation string
+
+    Args:
+        nested: Nested sequence
+        sequence_type: Type of items treated as nested sequences
+
+    Returns:
+        Links notation string
+    """
+    # Tokens are collected in one list and joined once
+    out: List[str] = []
+    _emit_notation(nested, out, sequence_type)
+    return ''.join(out)
+
+
+@functools.lru_cache(maxsize=NOTATION_CACHE_SIZE)
+def _format_cached(key: Tuple[Any, ...]) -> str:
+    """
+    Cached _format_notation for nested lists converted by _tuplify
+
+    Args:
+        key: Nested tuple structure
+
+    Returns:
+        Links notation string
+    """
+    return _format_notation(key, tuple)
+
+
+def _tuplify(nested_list: List[Any]) -> Optional[Tuple[Any, ...]]:
+    """
+    Convert a nested list of ints/strings to a hashable nested tuple
+
+    Args:
+        nested_list: Nested list structure
+
+    Returns:
+        Nested tuple, or None if the list holds other value types
+    """
+    parts = []
+    for element in nested_list:
+        if type(element) is list:
+            element = _tuplify(element)
+            if element is None:
+                return None
+        elif type(element) is not int and type(element) is not str:
+            return None
+        parts.append(element)
+    return tuple(parts)
+
+
+def _parse_notation(notation: str) -> List[Any]:
+    """
+    Parse stripped Links notation string to nested list
+
+    Args:
+        notation: Links notation string
+
+    Returns:
+        Nested list structure
+    """
+    # The innermost open list is stack[-1]; stack[0] collects top-level items
+    stack: List[List[Any]] = [[]]
+
+    for match in _NOTATION_TOKEN.finditer(notation):
+        kind = match.lastindex
+        if kind == 1:
+            nested: List[Any] = []
+            stack[-1].append(nested)
+            stack.append(nested)
+        elif kind == 2:
+            if len(stack) > 1:
+                stack.pop()
+        elif kind == 3:
+            stack[-1].append(int(match.group(3)))
+
+    result = stack[0]
+    # Unwrap the outer parentheses: "((1 2) (3 4))" -> [[1, 2], [3, 4]]
+    if len(result) == 1 and isinstance(result[0], list):
+        return result[0]
+    return result
+
+
+@functools.lru_cache(maxsize=NOTATION_CACHE_SIZE)
+def _parse_cached(notation: str) -> List[Any]:
+    """
+    Cached _parse_notation; the result must not be mutated
+
+    Args:
+        notation: Stripped Links notation string
+
+    Returns:
+        Shared nested list structure
+    """
+    return _parse_notation(notation)
+
+
+def _copy_nested(nested_list: List[Any]) -> List[Any]:
+    """
+    Copy a nested list structure produced by the parser
+
+    Args:
+        nested_list: Nested list structure
+
+    Returns:
+        Independent copy of nested_list
+    """
+    return [
+        _copy_nested(element) if type(element) is list else element
+        for element in nested_list
+    ]
+
+
+def clear_notation_cache() -> None:
+    """Clear the Links notation parse and format caches"""
+    _parse_cached.cache_clear()
+    _format_cached.cache_clear()
+
+
+class _PendingLink:
+    """A [source, target] pair planned for batched creation"""
+
+    __slots__ = ("source", "target", "height", "link_id")
+
+    def __init__(self, source: Any, target: Any):
+        self.source = source
+        self.target = target
+        # Leaf pairs have height 1, parents are one level above their children
+        self.height = 1 + max(
+            (child.height for child in (source, target) if isinstance(child, _PendingLink)),
+            default=0
+        )
+        self.link_id: Optional[int] = None
+
+    def resolve_source(self) -> int:
+        """Get the source ID, using the created ID of a nested pair"""
+        return self.source.link_id if isinstance(self.source, _PendingLink) else self.source
+
+    def resolve_target(self) -> int:
+        """Get the target ID, using the created ID of a nested pair"""
+        return self.target.link_id if isinstance(self.target, _PendingLink) else self.target
+
 
 class RecursiveLinks:
     """
@@ -14,16 +188,20 @@ class RecursiveLinks:
     Converts between Python nested lists/dicts and Links notation:
     - [[1, 2], [3, 4]] ↔ ((1 2) (3 4))
     - { "1": [1, { "2": [5, 6] }, 3, 4] } ↔ (1: 1 (2: 5 6) 3 4)
+
+    The notation conversion methods are static and never touch the database,
+    e.g. RecursiveLinks.parse_links_notation("((1 2))").
     """
 
-    def __init__(self, db_path: Optional[str] = None):
+    def __init__(self, db_path: Optional[str] = None, links: Optional[ILinks] = None):
         """
         Initialize RecursiveLinks
 
         Args:
             db_path: Path to database file
+            links: Existing ILinks instance to wrap instead of opening db_path
         """
-        self.links = ILinks(db_path)
+        self.links = links if links is not None else ILinks(db_path)
         self.id_counter = 1000000  # Start high to avoid conflicts with user IDs
 
     def get_links(self) -> ILinks:
@@ -51,46 +229,82 @@ class RecursiveLinks:
         Create links from nested list structure
         [[1, 2], [3, 4]] represents two links: (1 2) and (3 4)
 
+        Each list item is a [source, target] pair; a source or target that is
+        itself a [source, target] list is created first and its link ID used
+        in place: [[[1, 2], 3]] creates (1 2) and then (<id of (1 2)> 3).
+
+        Links are created in batches, one nesting level at a time, so every
+        innermost pair is created before any pair that contains one. New IDs
+        therefore follow that order, not a depth-first walk: in a fresh
+        database [[[1, 2], 3], [4, 5]] creates (1 2) as link 1, (4 5) as
+        link 2 and then (1 3) as link 3, returning [3, 2].
+
         Args:
             nested_list: Nested list structure
 
         Returns:
-            List of created link IDs
+            List of created link IDs, one per top-level item
         """
         try:
-            link_ids = []
+            # Plan every pair first, grouped by height so children precede parents
+            levels: List[List[_PendingLink]] = []
+            roots = []
 
             for item in nested_list:
                 if isinstance(item, list):
-                    if len(item) >= 2:
-                        # Create a link from [source, target]
-                        source, target = item[0], item[1]
-
-                        # Recursively handle nested lists
-                        actual_source = (
-                            self.create_from_nested_list([source])[0]
-                            if isinstance(source, list)
-                            else source
-                        )
-                        actual_target = (
-                            self.create_from_nested_list([target])[0]
-                            if isinstance(target, list)
-                            else target
-                        )
-
-                        link_id = self.links.create([actual_source, actual_target])
-                        link_ids.append(link_id)
-                    else:
-                        raise ValueError("List items must have at least 2 elements [source, target]")
+                    roots.append(self._plan_pending_link(item, levels))
                 else:
                     # Single value - skip
                     logger.warning(f"Skipping non-list item in nested list: {item}")
 
-            return link_ids
+            for level in levels:
+                link_ids = self.links.create_many([
+                    [pending.resolve_source(), pending.resolve_target()]
+                    for pending in level
+                ])
+                for pending, link_id in zip(level, link_ids):
+                    pending.link_id = link_id
+
+            return [pending.link_id for pending in roots]
         except Exception as error:
             logger.error(f"Failed to create from nested list: {error}")
             raise
 
+    def _plan_pending_link(
+        self,
+        node: List[Any],
+        levels: List[List["_PendingLink"]]
+    ) -> "_PendingLink":
+        """
+        Plan creation of a [source, target] node and its nested pairs
+
+        Args:
+            node: [source, target] list, items may be nested lists
+            levels: Pending links grouped by height, extended in place
+
+        Returns:
+            Pending link for node
+        """
+        if len(node) < 2:
+            raise ValueError("List items must have at least 2 elements [source, target]")
+
+        source = (
+            self._plan_pending_link(node[0], levels)
+            if isinstance(node[0], list)
+            else node[0]
+        )
+        target = (
+            self._plan_pending_link(node[1], levels)
+            if isinstance(node[1], list)
+            else node[1]
+        )
+
+        pending = _PendingLink(source, target)
+        while len(levels) < pending.height:
+            levels.append([])
+        levels[pending.height - 1].append(pending)
+        return pending
+
     def create_from_nested_dict(self, nested_dict: Dict[str, Any]) -> Dict[str, int]:
         """
         Create links from nested dict structure with references
@@ -103,26 +317,54 @@ class RecursiveLinks:
             Map of reference names to created link IDs
         """
         try:
-            reference_map = {}
-
-            # Process each named link in the dict
-            for ref_name, value in nested_dict.items():
-                if isinstance(value, list):
-                    # Create a sequence of links from the list
-                    link_id = self._create_sequence_from_list(value, reference_map)
-                    reference_map[ref_name] = link_id
-                else:
-                    logger.warning(f"Skipping non-list value in nested dict: {ref_name}={value}")
-
+            reference_map: Dict[str, int] = {}
+            self._create_from_nested_dict_first(nested_dict, reference_map, [])
             return reference_map
         except Exception as error:
             logger.error(f"Failed to create from nested dict: {error}")
             raise
 
+    def _create_from_nested_dict_first(
+        self,
+        nested_dict: Dict[str, Any],
+        reference_map: Dict[str, int],
+        recorded: List[str]
+    ) -> Optional[int]:
+        """
+        Create links for each named link in a dict, recording their IDs
+
+        Args:
+            nested_dict: Nested dict structure with named links
+            reference_map: Map to store reference IDs, updated in place
+            recorded: Reference names in the order they are stored, extended in place
+
+        Returns:
+            ID of the first reference stored while creating nested_dict,
+            including those of its nested dicts, or None
+        """
+        start = len(recorded)
+
+        # Process each named link in the dict
+        for ref_name, value in nested_dict.items():
+            if isinstance(value, list):
+                # Create a sequence of links from the list
+                link_id = self._create_sequence_from_list(value, reference_map, recorded)
+                reference_map[ref_name] = link_id
+                recorded.append(ref_name)
+            else:
+                logger.warning(f"Skipping non-list value in nested dict: {ref_name}={value}")
+
+        # Nested names are stored before their parents, so this is the
+        # innermost reference of the first named link, as with a separate map
+        if len(recorded) == start:
+            return None
+        return reference_map[recorded[start]]
+
     def _create_sequence_from_list(
         self,
         lst: List[Any],
-        reference_map: Dict[str, int]
+        reference_map: Dict[str, int],
+        recorded: List[str]
     ) -> int:
         """
         Create a sequence of links from a list, handling nested dicts
@@ -130,6 +372,7 @@ class RecursiveLinks:
         Args:
             lst: List with potential nested dicts
             reference_map: Map to store reference IDs
+            recorded: Reference names in the order they are stored
 
         Returns:
             ID of the created sequence link
@@ -137,32 +380,30 @@ class RecursiveLinks:
         if not lst:
             raise ValueError("Cannot create sequence from empty list")
 
-        # For lists with exactly 2 elements, create a single link
-        if len(lst) == 2 and not self._has_nested_dict(lst):
+        # For lists with exactly 2 elements and no nested dict, create a single link
+        if len(lst) == 2:
             source, target = lst[0], lst[1]
-            return self.links.create([source, target])
+            if not isinstance(source, dict) and not isinstance(target, dict):
+                return self.links.create([source, target])
 
         # For longer sequences or nested structures, create a chain of links
         current_id = None
 
         for item in lst:
             if isinstance(item, dict):
-                # Nested dict with references
-                nested_refs = self.create_from_nested_dict(item)
-                # Use the first created link from nested dict
-                first_ref = next(iter(nested_refs.values()))
+                # Nested dict with references, linked through its first named link
+                first_ref = self._create_from_nested_dict_first(item, reference_map, recorded)
+                if first_ref is None:
+                    raise ValueError("Nested dict must contain at least one list value")
 
                 if current_id is None:
                     current_id = first_ref
                 else:
                     # Create link connecting previous to this nested structure
                     current_id = self.links.create([current_id, first_ref])
-
-                # Merge reference maps
-                reference_map.update(nested_refs)
             elif isinstance(item, list):
                 # Nested list
-                nested_id = self._create_sequence_from_list(item, reference_map)
+                nested_id = self._create_sequence_from_list(item, reference_map, recorded)
 
                 if current_id is None:
                     current_id = nested_id
@@ -177,18 +418,6 @@ class RecursiveLinks:
 
         return current_id
 
-    def _has_nested_dict(self, lst: List[Any]) -> bool:
-        """
-        Check if list contains nested dicts
-
-        Args:
-            lst: List to check
-
-        Returns:
-            True if contains nested dicts
-        """
-        return any(isinstance(item, dict) for item in lst)
-
     def read_as_nested_list(self, restriction: Optional[List[int]] = None) -> List[List[int]]:
         """
         Read links and convert to nested list structure
@@ -200,23 +429,17 @@ class RecursiveLinks:
             Nested list structure
         """
         try:
-            result = []
-            visited = set()
-
-            def handler(link):
-                if link["id"] not in visited:
-                    visited.add(link["id"])
-                    result.append([link["source"], link["target"]])
-                return self.links.constants.CONTINUE
-
-            self.links.each(restriction, handler)
-
-            return result
+            # Link IDs are unique, so no de-duplication is needed
+            return [
+                [link.source, link.target]
+                for link in self.links.collect(restriction)
+            ]
         except Exception as error:
             logger.error(f"Failed to read as nested list: {error}")
             raise
 
-    def to_links_notation(self, nested_list: List[Any]) -> str:
+    @staticmethod
+    def to_links_notation(nested_list: List[Any]) -> str:
         """
         Convert nested list to Links notation string
         [[1, 2], [3, 4]] -> "((1 2) (3 4))"
@@ -227,16 +450,13 @@ class RecursiveLinks:
         Returns:
             Links notation string
         """
-        def convert(item):
-            if isinstance(item, list):
-                inner = ' '.join(convert(el) for el in item)
-                return f"({inner})"
-            return str(item)
+        key = _tuplify(nested_list)
+        if key is None:
+            return _format_notation(nested_list)
+        return _format_cached(key)
 
-        inner = ' '.join(convert(item) for item in nested_list)
-        return f"({inner})"
-
-    def to_links_notation_with_refs(self, nested_dict: Dict[str, Any]) -> str:
+    @staticmethod
+    def to_links_notation_with_refs(nested_dict: Dict[str, Any]) -> str:
         """
         Convert nested dict with references to Links notation string
         { "1": [1, { "2": [5, 6] }, 3, 4] } -> "(1: 1 (2: 5 6) 3 4)"
@@ -247,20 +467,37 @@ class RecursiveLinks:
         Returns:
             Links notation string with references
         """
-        def convert(item, ref_name=None):
+        def emit_refs(refs, out):
+            # Nested dict with its own references
+            for position, (ref, val) in enumerate(refs.items()):
+                if position:
+                    out.append(' ')
+                emit(val, out, ref)
+
+        def emit(item, out, ref_name=None):
             if isinstance(item, dict):
-                # Nested dict with its own references
-                parts = [convert(val, ref) for ref, val in item.items()]
-                return ' '.join(parts)
+                emit_refs(item, out)
             elif isinstance(item, list):
-                inner = ' '.join(convert(el) for el in item)
-                return f"({ref_name}: {inner})" if ref_name else f"({inner})"
-            return str(item)
+                out.append('(')
+                if ref_name:
+                    out.append(f"{ref_name}:")
+                    out.append(' ')
+                for position, element in enumerate(item):
+                    if position:
+                        out.append(' ')
+                    emit(element, out)
+                out.append(')')
+            else:
+                out.append(str(item))
 
-        parts = [convert(val, ref) for ref, val in nested_dict.items()]
-        return f"({' '.join(parts)})"
+        # Tokens are collected in one list and joined once
+        out: List[str] = ['(']
+        emit_refs(nested_dict, out)
+        out.append(')')
+        return ''.join(out)
 
-    def parse_links_notation(self, notation: str) -> List[Any]:
+    @staticmethod
+    def parse_links_notation(notation: str) -> List[Any]:
         """
         Parse Links notation string to nested list
         "((1 2) (3 4))" -> [[1, 2], [3, 4]]
@@ -271,45 +508,5 @@ class RecursiveLinks:
         Returns:
             Nested list structure
         """
-        notation = notation.strip()
-
-        # Remove outer parentheses
-        if notation.startswith('(') and notation.endswith(')'):
-            notation = notation[1:-1].strip()
-
-        result = []
-        current = ''
-        depth = 0
-
-        for char in notation:
-            if char == '(':
-                depth += 1
-                current += char
-            elif char == ')':
-                depth -= 1
-                current += char
-
-                if depth == 0 and current.strip():
-                    result.append(self.parse_links_notation(current.strip()))
-                    current = ''
-            elif char == ' ' and depth == 0:
-                if current.strip():
-                    # Parse number
-                    try:
-                        num = int(current.strip())
-                        result.append(num)
-                    except ValueError:
-                        pass
-                    current = ''
-            else:
-                current += char
-
-        # Handle remaining content
-        if current.strip():
-            try:
-                num = int(current.strip())
-                result.append(num)
-            except ValueError:
-                pass
-
-        return result
+        # Cached results are shared, so callers get their own copy
+        return _copy_nested(_parse_cached(notation.strip()))
@@ -4,7 +4,7 @@ import os
 import re
 import subprocess
 from pathlib import Path
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Sequence, Tuple
 from links_client.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -13,6 +13,18 @@ logger = get_logger(__name__)
 DEFAULT_DB_DIR = Path(__file__).parent.parent.parent.parent / "data"
 DEFAULT_DB_FILE = DEFAULT_DB_DIR / "linkdb.links"
 
+# Maximum number of links created by a single clink query
+CREATE_BATCH_SIZE = 2000
+
+# Query matching every link, used with --after to list the database
+ALL_LINKS_QUERY = "((($i: $s $t)) (($i: $s $t)))"
+
+# One "(id: source target)" link at the start of an output line
+LINK_LINE_PATTERN = re.compile(
+    r'^[^\S\n]*\((\d+):[^\S\n]+(\d+)[^\S\n]+(\d+)\)',
+    re.MULTILINE
+)
+
 
 class LinkDBService:
     """
@@ -29,6 +41,8 @@ class LinkDBService:
         """
         self.db_path = db_path or str(DEFAULT_DB_FILE)
         self.next_id = 1  # Track next available ID for menu items
+        # Environment for clink, built on the first query and reused afterwards
+        self._clink_env: Optional[Dict[str, str]] = None
 
     def execute_query(
         self,
@@ -69,17 +83,11 @@ class LinkDBService:
         try:
             logger.debug(f"Executing clink command: {' '.join(command)}")
 
-            # Set PATH to include .dotnet/tools directory where clink is installed
-            env = os.environ.copy()
-            home = os.path.expanduser('~')
-            dotnet_tools = os.path.join(home, '.dotnet', 'tools')
-            env['PATH'] = f"{dotnet_tools}:{env.get('PATH', '')}"
-
             result = subprocess.run(
                 command,
                 capture_output=True,
                 text=True,
-                env=env,
+                env=self._get_clink_env(),
                 check=True
             )
 
@@ -98,6 +106,21 @@ class LinkDBService:
             logger.error(f"Failed to execute clink command: {error}")
             raise RuntimeError(f"LinkDB query failed: {error}")
 
+    def _get_clink_env(self) -> Dict[str, str]:
+        """
+        Get the environment used to run clink
+
+        Returns:
+            Copy of os.environ with PATH including .dotnet/tools, where clink is installed
+        """
+        if self._clink_env is None:
+            env = os.environ.copy()
+            home = os.path.expanduser('~')
+            dotnet_tools = os.path.join(home, '.dotnet', 'tools')
+            env['PATH'] = f"{dotnet_tools}:{env.get('PATH', '')}"
+            self._clink_env = env
+        return self._clink_env
+
     def parse_links(self, output: str) -> List[Dict[str, int]]:
         """
         Parse clink output to extract links
@@ -109,23 +132,14 @@ class LinkDBService:
         Returns:
             List of parsed links
         """
-        if not output or not output.strip():
+        if not output:
             return []
 
-        lines = [line.strip() for line in output.split('\n') if line.strip()]
-        links = []
-
-        for line in lines:
-            # Match pattern: (id: source target)
-            match = re.match(r'\((\d+):\s+(\d+)\s+(\d+)\)', line)
-            if match:
-                links.append({
-                    'id': int(match.group(1)),
-                    'source': int(match.group(2)),
-                    'target': int(match.group(3))
-                })
-
-        return links
+        # One regex pass over the whole output instead of matching per line
+        return [
+            {'id': int(link_id), 'source': int(source), 'target': int(target)}
+            for link_id, source, target in LINK_LINE_PATTERN.findall(output)
+        ]
 
     def create_link(self, source: int, target: int) -> Dict[str, int]:
         """
@@ -155,6 +169,54 @@ class LinkDBService:
 
         raise RuntimeError("Failed to parse created link")
 
+    def create_links_batch(
+        self,
+        pairs: Sequence[Tuple[int, int]],
+        batch_size: int = CREATE_BATCH_SIZE
+    ) -> List[Dict[str, int]]:
+        """
+        Create several links with one clink query per batch
+
+        Args:
+            pairs: (source, target) pairs to create
+            batch_size: Maximum number of links per query
+
+        Returns:
+            Created links in the same order as pairs
+
+        Raises:
+            RuntimeError: If link creation fails
+        """
+        created = []
+
+        for start in range(0, len(pairs), batch_size):
+            batch = pairs[start:start + batch_size]
+            substitution = ' '.join(f"({source} {target})" for source, target in batch)
+            output = self.execute_query(f"() ({substitution})", changes=True)
+
+            # Match created links back to pairs; identical pairs in one query
+            # may be reported as a single link
+            ids_by_pair: Dict[Tuple[int, int], List[int]] = {}
+            for match in re.finditer(r'\((\d+):\s+(\d+)\s+(\d+)\)', output):
+                pair = (int(match.group(2)), int(match.group(3)))
+                ids_by_pair.setdefault(pair, []).append(int(match.group(1)))
+
+            used: Dict[Tuple[int, int], int] = {}
+            for source, target in batch:
+                pair = (source, target)
+                ids = ids_by_pair.get(pair)
+                if not ids:
+                    raise RuntimeError("Failed to parse created link")
+                index = min(used.get(pair, 0), len(ids) - 1)
+                used[pair] = index + 1
+                created.append({
+                    'id': ids[index],
+                    'source': source,
+                    'target': target
+                })
+
+        return created
+
     def read_all_links(self) -> List[Dict[str, int]]:
         """
         Read all links from database
@@ -162,10 +224,25 @@ class LinkDBService:
         Returns:
             List of all links
         """
-        query = "((($i: $s $t)) (($i: $s $t)))"
-        output = self.execute_query(query, after=True)
+        output = self.execute_query(ALL_LINKS_QUERY, after=True)
         return self.parse_links(output)
 
+    def read_all_link_tuples(self) -> List[Tuple[int, int, int]]:
+        """
+        Read all links from database as (id, source, target) tuples
+
+        Parses the whole clink output in a single regex pass without
+        splitting it into lines or building a dict per link.
+
+        Returns:
+            List of all links as tuples
+        """
+        output = self.execute_query(ALL_LINKS_QUERY, after=True)
+        return [
+            (int(link_id), int(source), int(target))
+            for link_id, source, target in LINK_LINE_PATTERN.findall(output)
+        ]
+
     def read_link(self, link_id: int) -> Optional[Dict[str, int]]:
         """
         Read a specific link by ID
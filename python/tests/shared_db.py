@@ -0,0 +1,32 @@
+"""Shared ILinks database for the API test modules"""
+
+import atexit
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from links_client.api.ilinks import ILinks
+
+_shared_links: Optional[ILinks] = None
+
+
+def get_shared_links() -> ILinks:
+    """
+    Get the ILinks database shared by all API test classes in this process
+
+    The database is created on first use and removed when the process exits,
+    so it works the same under pytest, pytest-xdist workers and unittest.
+
+    Returns:
+        Shared ILinks instance
+    """
+    global _shared_links
+    if _shared_links is None:
+        # Keep the database on tmpfs when available to avoid disk I/O
+        tmp_root = "/dev/shm" if os.path.isdir("/dev/shm") else None
+        test_dir = Path(tempfile.mkdtemp(prefix="links-test-", dir=tmp_root))
+        atexit.register(shutil.rmtree, test_dir, ignore_errors=True)
+        _shared_links = ILinks(str(test_dir / "test.links"))
+    return _shared_links
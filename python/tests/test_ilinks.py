@@ -1,37 +1,35 @@
 """Test file for ILinks flat API"""
 
+import importlib.util
 import os
+import sys
+import tempfile
 import unittest
 from pathlib import Path
+from unittest import mock
+from links_client.api import ilinks
 from links_client.api.ilinks import ILinks, LinkConstants
 
+# Make the shared test database helper importable without a tests package
+sys.path.insert(0, str(Path(__file__).parent))
+
+from shared_db import get_shared_links
+
 
 class TestILinksAPI(unittest.TestCase):
     """Test cases for ILinks flat API"""
 
     @classmethod
     def setUpClass(cls):
-        """Set up test database path"""
-        cls.test_db_path = Path("data/test-ilinks.links")
-        # Clean up test database if exists
-        if cls.test_db_path.exists():
-            cls.test_db_path.unlink()
-
-    @classmethod
-    def tearDownClass(cls):
-        """Clean up test database"""
-        if cls.test_db_path.exists():
-            cls.test_db_path.unlink()
-
-    def setUp(self):
-        """Set up test instance"""
-        self.links = ILinks(str(self.test_db_path))
+        """Use the shared test database; tests rely on disjoint value ranges"""
+        cls.links = get_shared_links()
 
     def test_constants(self):
         """Test that constants are available"""
         constants = self.links.get_constants()
-        self.assertEqual(constants, LinkConstants)
+        self.assertIs(constants, LinkConstants)
         self.assertEqual(LinkConstants.ANY.value, 0)
+        self.assertEqual(LinkConstants.ANY, 0)
         self.assertIsNotNone(LinkConstants.CONTINUE)
         self.assertIsNotNone(LinkConstants.BREAK)
 
@@ -65,21 +63,87 @@ class TestILinksAPI(unittest.TestCase):
         self.assertIsNotNone(captured_change["after"])
         self.assertEqual(captured_change["after"]["id"], link_id)
 
+    def test_create_many(self):
+        """Test creating several links at once"""
+        link_ids = self.links.create_many([[240, 250], [260, 270]])
+        self.assertEqual(len(link_ids), 2)
+        self.assertNotEqual(link_ids[0], link_ids[1])
+        self.assertEqual(self.links.count([link_ids[1], 260, 270]), 1)
+
+    def test_create_many_with_handler(self):
+        """Test that handler is called once per link on create_many"""
+        changes = []
+
+        link_ids = self.links.create_many([[380, 390], [380, 400]], changes.append)
+        self.assertEqual(len(changes), 2)
+        self.assertTrue(all(change["before"] is None for change in changes))
+        self.assertEqual([change["after"]["id"] for change in changes], link_ids)
+        self.assertEqual(changes[1]["after"]["target"], 400)
+
+    def test_create_many_invalid_substitution(self):
+        """Test that create_many rejects substitutions without source and target"""
+        with self.assertRaises(ValueError):
+            self.links.create_many([[1, 2], [3]])
+
+    def test_failed_create_drops_cache(self):
+        """Test that a create which fails after writing leaves no stale cache"""
+        db = self.links.db
+        create_link = db.create_link
+        create_links_batch = db.create_links_batch
+
+        def write_then_fail(*args):
+            create_link(*args)
+            raise RuntimeError("Failed to parse created link")
+
+        def write_first_batch_then_fail(pairs):
+            create_links_batch(pairs[:1])
+            raise RuntimeError("LinkDB query failed")
+
+        self.assertEqual(self.links.count([720, 0]), 0)
+        with mock.patch.object(db, "create_link", side_effect=write_then_fail):
+            with self.assertRaises(RuntimeError):
+                self.links.create([720, 730])
+        self.assertEqual(self.links.count([720, 730]), 1)
+
+        with mock.patch.object(db, "create_links_batch", side_effect=write_first_batch_then_fail):
+            with self.assertRaises(RuntimeError):
+                self.links.create_many([[720, 740], [720, 750]])
+        self.assertEqual(self.links.count([720, 740]), 1)
+
+    def test_rejected_write_keeps_cache(self):
+        """Test that errors raised before any database write keep the cache warm"""
+        self.links.count([1])
+        with mock.patch.object(self.links.db, "read_all_link_tuples") as read_all:
+            for _ in range(5):
+                with self.assertRaises(ValueError):
+                    self.links.delete([999999, 0, 0])
+            with self.assertRaises(ValueError):
+                self.links.update([999999, 0, 0], [1, 2])
+            with self.assertRaises(ValueError):
+                self.links.create([1])
+            self.links.count([1])
+
+        read_all.assert_not_called()
+        self.assertFalse(self.links._cache_dirty)
+
     def test_create_invalid_substitution(self):
         """Test that creating with invalid substitution raises error"""
         with self.assertRaises(ValueError):
             self.links.create([1])
 
     def test_count_all_links(self):
-        """Test counting all links"""
-        count = self.links.count()
-        self.assertGreater(count, 0)
+        """Test counting all links in a pristine database"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            links = ILinks(os.path.join(tmp_dir, "count-all.links"))
+            links.create([1, 2])
+            links.create([3, 4])
+            self.assertEqual(links.count(), 2)
+            # The full listing used for counting also warms the cache
+            self.assertFalse(links._cache_dirty)
 
     def test_count_with_restriction(self):
         """Test counting links with restriction"""
-        self.links.create([10, 20])
-        self.links.create([10, 30])
-        self.links.create([40, 20])
+        self.links.create_many([[10, 20], [10, 30], [40, 20]])
 
         count = self.links.count([10, 0])
         self.assertGreaterEqual(count, 2)
@@ -91,46 +155,171 @@ class TestILinksAPI(unittest.TestCase):
 
     def test_each_iterate_all(self):
         """Test iterating through all links"""
-        all_links = []
+        self.links.create([330, 340])
+        all_links = [None] * self.links.count()
+        position = 0
 
-        def handler(link):
-            all_links.append(link)
-            return LinkConstants.CONTINUE
+        def handler(link, _CONT=LinkConstants.CONTINUE):
+            nonlocal position
+            all_links[position] = link
+            position += 1
+            return _CONT
 
         result = self.links.each(None, handler)
         self.assertEqual(result, LinkConstants.CONTINUE)
         self.assertGreater(len(all_links), 0)
+        self.assertEqual(position, len(all_links))
 
     def test_each_with_break(self):
         """Test that each respects Break signal"""
+        self.links.create_many([[350, 360], [350, 370]])
         iteration_count = 0
 
-        def handler(link):
+        def handler(link, _CONT=LinkConstants.CONTINUE, _BRK=LinkConstants.BREAK):
             nonlocal iteration_count
             iteration_count += 1
             if iteration_count >= 2:
-                return LinkConstants.BREAK
-            return LinkConstants.CONTINUE
+                return _BRK
+            return _CONT
 
         result = self.links.each(None, handler)
         self.assertEqual(result, LinkConstants.BREAK)
         self.assertEqual(iteration_count, 2)
 
+    def test_each_with_brk(self):
+        """Test that calling brk() stops iteration and None continues it"""
+        self.links.create_many([[570, 580], [570, 590], [570, 600]])
+        visited = []
+
+        def handler(link):
+            visited.append(link)
+            if len(visited) == 2:
+                self.links.brk()
+
+        result = self.links.each([570, 0], handler)
+        self.assertEqual(result, LinkConstants.BREAK)
+        self.assertEqual(len(visited), 2)
+
+        visited.clear()
+        result = self.links.each([570, 0], visited.append)
+        self.assertEqual(result, LinkConstants.CONTINUE)
+        self.assertEqual(len(visited), 3)
+
+    def test_brk_not_swallowed_by_handler(self):
+        """Test that brk() stops iteration through a handler's except Exception"""
+        self.links.create_many([[640, 650], [640, 660]])
+        visited = []
+
+        def handler(link):
+            try:
+                visited.append(link)
+                self.links.brk()
+            except Exception:
+                pass
+
+        result = self.links.each([640, 0], handler)
+        self.assertEqual(result, LinkConstants.BREAK)
+        self.assertEqual(len(visited), 1)
+
+    def test_each_break_by_value(self):
+        """Test that returning the value of LinkConstants.BREAK stops iteration"""
+        self.links.create_many([[310, 320], [310, 330]])
+        iteration_count = 0
+
+        def handler(link):
+            nonlocal iteration_count
+            iteration_count += 1
+            return LinkConstants.BREAK.value
+
+        result = self.links.each([310, 0], handler)
+        self.assertEqual(result, LinkConstants.BREAK)
+        self.assertEqual(iteration_count, 1)
+
     def test_each_with_restriction(self):
         """Test filtering links with restriction"""
         link_id = self.links.create([100, 200])
-        found_links = []
+        found_links = [None] * self.links.count([100, 200])
+        position = 0
 
-        def handler(link):
-            found_links.append(link)
-            return LinkConstants.CONTINUE
+        def handler(link, _CONT=LinkConstants.CONTINUE):
+            nonlocal position
+            found_links[position] = link
+            position += 1
+            return _CONT
 
         self.links.each([100, 200], handler)
         self.assertGreater(len(found_links), 0)
+        self.assertEqual(position, len(found_links))
         self.assertTrue(
             any(l["source"] == 100 and l["target"] == 200 for l in found_links)
         )
 
+    def test_each_collect(self):
+        """Test that each_collect returns the links each() visits"""
+        self.links.create_many([[410, 420], [410, 430], [440, 420]])
+        visited = []
+
+        def handler(link, _CONT=LinkConstants.CONTINUE):
+            visited.append(link)
+            return _CONT
+
+        self.links.each([410, 0], handler)
+        collected = self.links.each_collect([410, 0])
+        self.assertEqual(collected, [link._asdict() for link in visited])
+        self.assertEqual(len(collected), self.links.count([410, 0]))
+        self.assertEqual(self.links.each_collect([999999, 999999]), [])
+
+    def test_collect(self):
+        """Test that collect returns Link tuples with dict-style field access"""
+        link_ids = self.links.create_many([[610, 620], [610, 630]])
+        links = self.links.collect([610, 0])
+
+        self.assertEqual([link.id for link in links], link_ids)
+        self.assertEqual(links[1]["target"], 630)
+        self.assertEqual(links[1][2], 630)
+        self.assertEqual(links[0]._asdict(), {"id": link_ids[0], "source": 610, "target": 620})
+
+    def test_link_mapping_access(self):
+        """Test that Link name access is limited to its fields"""
+        link = self.links.collect([self.links.create([680, 690])])[0]
+
+        self.assertEqual(dict(link), link._asdict())
+        self.assertIn("source", link)
+        self.assertNotIn("count", link)
+        self.assertEqual(link.get("target"), 690)
+        self.assertIsNone(link.get("missing"))
+        for key in ("count", "_fields", "missing"):
+            with self.assertRaises(KeyError):
+                link[key]
+
+    def test_each_rows(self):
+        """Test that each_rows returns matching links as parallel columns"""
+        self.links.create_many([[450, 460], [450, 470]])
+        for restriction in ([450, 0], [0, 470], [999999, 0], None):
+            expected = self.links.each_collect(restriction)
+            ids, sources, targets = self.links.each_rows(restriction)
+            self.assertEqual(
+                [list(map(int, column)) for column in (ids, sources, targets)],
+                [[link[field] for link in expected] for field in ("id", "source", "target")]
+            )
+
+    @unittest.skipIf(ilinks.np is None, "NumPy is not installed")
+    def test_each_rows_vectorized(self):
+        """Test that vectorized each_rows matches the Python scan"""
+        self.links.create_many([[480, 490], [480, 500]])
+        expected = self.links.each_rows([480, 490])
+        with mock.patch.object(ilinks, "NUMPY_THRESHOLD", 0), \
+                mock.patch.object(ilinks, "VECTORIZE_SHARE", 0):
+            rows = self.links.each_rows([480, 490])
+        for column, expected_column in zip(rows, expected):
+            self.assertEqual(column.tolist(), expected_column.tolist())
+
+        # Returned columns are copies, so changing them leaves the cache alone
+        sources = self.links.each_rows()[1]
+        sources[:] = 0
+        self.assertEqual(self.links.count([480, 490]), 1)
+        self.assertNotEqual(self.links.each_rows()[1].tolist(), sources.tolist())
+
     def test_update_link(self):
         """Test updating a link"""
         link_id = self.links.create([50, 60])
@@ -139,16 +328,34 @@ class TestILinksAPI(unittest.TestCase):
         self.assertEqual(updated_id, link_id)
 
         # Verify the update
-        found_links = []
-
-        def handler(link):
-            found_links.append(link)
-            return LinkConstants.CONTINUE
-
-        self.links.each([link_id, 0, 0], handler)
+        found_links = self.links.collect([link_id, 0, 0])
         self.assertEqual(found_links[0]["source"], 70)
         self.assertEqual(found_links[0]["target"], 80)
 
+    def test_update_keeps_link_position(self):
+        """Test that an updated link keeps its place in iteration order"""
+        link_ids = self.links.create_many([[510, 520], [510, 530], [510, 540]])
+        ids_before = [link["id"] for link in self.links.each_collect()]
+
+        self.links.update([link_ids[1], 0, 0], [550, 560])
+        ids_after = [link["id"] for link in self.links.each_collect()]
+        self.assertEqual(ids_after, ids_before)
+        self.assertEqual(self.links.each_collect([link_ids[1]])[0]["source"], 550)
+
+    def test_update_keeps_bucket_order(self):
+        """Test that a link moved between buckets stays in id order on every path"""
+        first_id, second_id = self.links.create_many([[905, 901], [907, 902]])
+        self.links.update([first_id, 0, 0], [907, 903])
+
+        def query():
+            first = self.links._find_first([907, 0])
+            return [link.id for link in self.links.collect([907, 0])], first.id
+
+        expected = ([first_id, second_id], first_id)
+        self.assertEqual(query(), expected)
+        self.links.invalidate_cache()
+        self.assertEqual(query(), expected)
+
     def test_update_with_handler(self):
         """Test that handler is called on update"""
         link_id = self.links.create([90, 100])
@@ -214,6 +421,116 @@ class TestILinksAPI(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.links.delete([999999, 0, 0])
 
+    def test_cache_tracks_changes(self):
+        """Test that cached links stay in sync with create/update/delete"""
+        count_before = self.links.count()
+        link_id = self.links.create([170, 180])
+        self.assertEqual(self.links.count(), count_before + 1)
+
+        self.links.update([link_id, 0, 0], [190, 200])
+        self.assertEqual(self.links.count([190, 200]), 1)
+        self.assertEqual(self.links.count([170, 180]), 0)
+
+        self.links.delete([link_id, 0, 0])
+        self.assertEqual(self.links.count(), count_before)
+
+        self.links.invalidate_cache()
+        self.assertEqual(self.links.count(), count_before)
+
+    def test_emptied_buckets_are_dropped(self):
+        """Test that deleting or moving the last link of a bucket removes the bucket"""
+        link_ids = self.links.create_many([[1310, 1320], [1330, 1340]])
+        self.links.update([link_ids[1], 0, 0], [1350, 1360])
+        self.links.delete([link_ids[0], 0, 0])
+
+        for key in (1310, 1330):
+            self.assertNotIn(key, self.links._by_source)
+        for key in (1320, 1340):
+            self.assertNotIn(key, self.links._by_target)
+        self.assertEqual(self.links.count([1350, 0]), 1)
+
+    @unittest.skipIf(ilinks.np is None, "NumPy is not installed")
+    def test_vectorized_filter_matches_scan(self):
+        """Test that NumPy filtering returns the same links as the Python scan"""
+        self.links.create_many([[210, 220], [210, 230]])
+        restrictions = [[0, 0], [210, 0], [0, 220], [210, 230], [0, 0, 0], [0, 210, 0]]
+
+        expected = [self.links._filter_links(r) for r in restrictions]
+        with mock.patch.object(ilinks, "NUMPY_THRESHOLD", 0), \
+                mock.patch.object(ilinks, "VECTORIZE_SHARE", 0):
+            for restriction, links in zip(restrictions, expected):
+                self.assertEqual(self.links._filter_links(restriction), links)
+                self.assertEqual(self.links.count(restriction), len(links))
+
+    @unittest.skipIf(ilinks.np is None, "NumPy is not installed")
+    def test_vectorized_filter_follows_writes(self):
+        """Test that the link columns stay in sync with creates, updates and deletes"""
+        link_ids = self.links.create_many([[1260, 1270], [1260, 1280]])
+        self.links.each_rows()
+
+        with mock.patch.object(ilinks, "NUMPY_THRESHOLD", 0), \
+                mock.patch.object(ilinks, "VECTORIZE_SHARE", 0):
+            new_id = self.links.create([1260, 1270])
+            self.links.update([link_ids[1], 0, 0], [1260, 1270])
+            self.links.delete([link_ids[0], 0, 0])
+            links = self.links.collect([1260, 1270])
+
+        self.assertEqual([link.id for link in links], sorted([link_ids[1], new_id]))
+        self.assertEqual(links, self.links.collect([1260, 1270]))
+
+    @unittest.skipIf(ilinks.np is None, "NumPy is not installed")
+    def test_unsigned_addresses(self):
+        """Test addresses past int64 on the vectorized path and past uint64 in Python"""
+        big = 2 ** 63 + 5
+        for huge, row_type in ((2 ** 64 - 1, ilinks.np.ndarray), (2 ** 64, list)):
+            links = ILinks()
+            links.db = mock.Mock()
+            links.db.read_all_link_tuples.return_value = [(1, big, 7), (2, big, huge), (3, 9, 7)]
+            links.db.update_link.return_value = {"id": 3, "source": big, "target": huge}
+
+            with mock.patch.object(ilinks, "NUMPY_THRESHOLD", 0), \
+                    mock.patch.object(ilinks, "VECTORIZE_SHARE", 0), \
+                    mock.patch.object(ilinks, "NUMBA_THRESHOLD", 0):
+                self.assertEqual(links.collect([big, huge]), [(2, big, huge)])
+                links.update([3], [big, huge])
+                self.assertEqual([link.id for link in links.collect([big, huge])], [2, 3])
+                self.assertEqual(links._find_first([big, 7]), (1, big, 7))
+                ids, sources, targets = links.each_rows([big, huge])
+
+            self.assertIsInstance(ids, row_type)
+            self.assertEqual(list(targets), [huge, huge])
+            self.assertEqual(list(links.each_rows()[1]), [big, big, big])
+
+    @unittest.skipIf(ilinks.np is None, "NumPy is not installed")
+    def test_create_existing_pair_keeps_columns(self):
+        """Test that creating a pair clink already has adds no second column row"""
+        links = ILinks()
+        links.db = mock.Mock()
+        links.db.read_all_link_tuples.return_value = [(1, 1, 2), (2, 3, 4), (3, 5, 6)]
+        links.db.create_link.return_value = {"id": 1, "source": 1, "target": 2}
+        links.each_rows()
+
+        self.assertEqual(links.create([1, 2]), 1)
+        self.assertEqual(links.each_rows()[0].tolist(), [1, 2, 3])
+        with mock.patch.object(ilinks, "NUMPY_THRESHOLD", 0), \
+                mock.patch.object(ilinks, "VECTORIZE_SHARE", 0):
+            self.assertEqual(links.collect([1, 2]), [(1, 1, 2)])
+            self.assertEqual(links.count([1, 2]), 1)
+
+    @unittest.skipIf(importlib.util.find_spec("numba") is None, "Numba is not installed")
+    def test_jit_filter_matches_scan(self):
+        """Test that Numba filtering returns the same links as the Python scan"""
+        self.links.create_many([[280, 290], [280, 300]])
+        restrictions = [[0, 0], [280, 0], [0, 290], [280, 300], [0, 280, 0], [999999, 0]]
+
+        expected = [self.links._filter_links(r) for r in restrictions]
+        with mock.patch.object(ilinks, "NUMPY_THRESHOLD", 0), \
+                mock.patch.object(ilinks, "VECTORIZE_SHARE", 0), \
+                mock.patch.object(ilinks, "NUMBA_THRESHOLD", 0):
+            for restriction, links in zip(restrictions, expected):
+                self.assertEqual(self.links._filter_links(restriction), links)
+                self.assertEqual(self.links._find_first(restriction), links[0] if links else None)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,6 +1,7 @@
 """Tests for LinkDBService"""
 
 import pytest
+import subprocess
 import sys
 from pathlib import Path
 
@@ -41,3 +42,70 @@ class TestLinkDBService:
         links = service.parse_links(output)
 
         assert links == []
+
+    def test_parse_links_indented_lines(self, service):
+        """Test parsing links on indented and CRLF-terminated lines"""
+        output = "  (1: 100 200)\r\n\n\t(2: 300 400)\r\nnot (3: 5 6)"
+        links = service.parse_links(output)
+
+        assert links == [
+            {'id': 1, 'source': 100, 'target': 200},
+            {'id': 2, 'source': 300, 'target': 400}
+        ]
+
+    def test_execute_query_reuses_environment(self, service, monkeypatch):
+        """Test that the clink environment is built once per service"""
+        environments = []
+
+        def run(command, **kwargs):
+            environments.append(kwargs["env"])
+            return subprocess.CompletedProcess(command, 0, stdout="(1: 1 1)\n", stderr="")
+
+        monkeypatch.setattr(subprocess, "run", run)
+        assert service.execute_query("()") == "(1: 1 1)"
+        service.execute_query("()")
+
+        assert environments[0] is environments[1]
+        assert ".dotnet" in environments[0]["PATH"]
+
+    def test_create_links_batch(self, service, monkeypatch):
+        """Test creating several links with batched queries"""
+        queries = []
+
+        def execute_query(query, **kwargs):
+            queries.append(query)
+            return "() ((1: 100 200))\n() ((2: 300 400))"
+
+        monkeypatch.setattr(service, "execute_query", execute_query)
+        links = service.create_links_batch([(100, 200), (300, 400)])
+
+        assert queries == ["() ((100 200) (300 400))"]
+        assert links == [
+            {'id': 1, 'source': 100, 'target': 200},
+            {'id': 2, 'source': 300, 'target': 400}
+        ]
+
+    def test_create_links_batch_splits_batches(self, service, monkeypatch):
+        """Test that pairs are split into batches of batch_size"""
+        queries = []
+
+        def execute_query(query, **kwargs):
+            queries.append(query)
+            return "() ((1: 100 200))"
+
+        monkeypatch.setattr(service, "execute_query", execute_query)
+        links = service.create_links_batch([(100, 200), (100, 200), (100, 200)], batch_size=2)
+
+        assert len(queries) == 2
+        assert [link['id'] for link in links] == [1, 1, 1]
+
+    def test_read_all_link_tuples(self, service, monkeypatch):
+        """Test reading links as tuples from clink output"""
+        output = "(1: 100 200)\n  (2: 300 400)\nsome random text (3: 5 6)"
+        monkeypatch.setattr(service, "execute_query", lambda *args, **kwargs: output)
+
+        assert service.read_all_link_tuples() == [(1, 100, 200), (2, 300, 400)]
+        assert service.read_all_links() == [
+            {'id': 1, 'source': 100, 'target': 200},
+            {'id': 2, 'source': 300, 'target': 400}
+        ]
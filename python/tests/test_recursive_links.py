@@ -1,9 +1,16 @@
 """Test file for RecursiveLinks API"""
 
 import os
+import sys
 import unittest
 from pathlib import Path
-from links_client.api.recursive_links import RecursiveLinks
+from unittest import mock
+from links_client.api.recursive_links import RecursiveLinks, clear_notation_cache
+
+# Make the shared test database helper importable without a tests package
+sys.path.insert(0, str(Path(__file__).parent))
+
+from shared_db import get_shared_links
 
 
 class TestRecursiveLinksAPI(unittest.TestCase):
@@ -11,21 +18,8 @@ class TestRecursiveLinksAPI(unittest.TestCase):
 
     @classmethod
     def setUpClass(cls):
-        """Set up test database path"""
-        cls.test_db_path = Path("data/test-recursive.links")
-        # Clean up test database if exists
-        if cls.test_db_path.exists():
-            cls.test_db_path.unlink()
-
-    @classmethod
-    def tearDownClass(cls):
-        """Clean up test database"""
-        if cls.test_db_path.exists():
-            cls.test_db_path.unlink()
-
-    def setUp(self):
-        """Set up test instance"""
-        self.recursive_links = RecursiveLinks(str(self.test_db_path))
+        """Wrap the shared test database; tests rely on disjoint value ranges"""
+        cls.recursive_links = RecursiveLinks(links=get_shared_links())
 
     def test_create_from_simple_nested_list(self):
         """Test creating links from simple nested list [[1, 2], [3, 4]]"""
@@ -53,6 +47,15 @@ class TestRecursiveLinksAPI(unittest.TestCase):
 
         self.assertGreater(len(link_ids), 0)
 
+    def test_create_from_deeply_nested_list_references_inner_link(self):
+        """Test that nested pairs are created first and referenced by ID"""
+        link_ids = self.recursive_links.create_from_nested_list([[[14, 15], 16]])
+
+        outer = self.recursive_links.read_as_nested_list([link_ids[0], 0, 0])
+        inner = self.recursive_links.read_as_nested_list([outer[0][0], 0, 0])
+        self.assertEqual(outer[0][1], 16)
+        self.assertEqual(inner, [[14, 15]])
+
     def test_create_from_invalid_list_item(self):
         """Test error for list items with less than 2 elements"""
         with self.assertRaises(ValueError):
@@ -85,6 +88,32 @@ class TestRecursiveLinksAPI(unittest.TestCase):
         self.assertGreater(ref_map["1"], 0)
         self.assertGreater(ref_map["2"], 0)
 
+    def test_nested_dict_links_first_stored_reference(self):
+        """Test that a nested dict is linked through the first reference it stores"""
+        ref_map = self.recursive_links.create_from_nested_dict({
+            "x": [1707, {"a": [{"b": [1705, 1706]}, 1704]}]
+        })
+
+        # "b" is stored before "a", so the chain links to it, not to "a"
+        link = self.recursive_links.links.collect([ref_map["x"]])[0]
+        self.assertEqual((link.source, link.target), (1707, ref_map["b"]))
+
+    def test_create_from_nested_list_level_order(self):
+        """Test that nested lists are created one nesting level at a time"""
+        created = []
+
+        def create_many(pairs):
+            link_ids = list(range(len(created) + 1, len(created) + len(pairs) + 1))
+            created.extend(pairs)
+            return link_ids
+
+        links = mock.Mock()
+        links.create_many.side_effect = create_many
+        link_ids = RecursiveLinks(links=links).create_from_nested_list([[[1, 2], 3], [4, 5]])
+
+        self.assertEqual(created, [[1, 2], [4, 5], [1, 3]])
+        self.assertEqual(link_ids, [3, 2])
+
     def test_read_as_nested_list(self):
         """Test reading links as nested list"""
         # Create some links first
@@ -122,7 +151,18 @@ class TestRecursiveLinksAPI(unittest.TestCase):
     def test_to_links_notation_deeply_nested(self):
         """Test converting deeply nested list to Links notation"""
         notation = self.recursive_links.to_links_notation([[[1, 2], 3]])
-        self.assertIn("(", notation)
+        self.assertEqual(notation, "(((1 2) 3))")
+
+    def test_to_links_notation_many_levels(self):
+        """Test converting a list nested many levels deep"""
+        nested = [1, 2]
+        for value in range(3, 103):
+            nested = [nested, value]
+
+        notation = self.recursive_links.to_links_notation(nested)
+        self.assertEqual(notation.count("("), 101)
+        self.assertTrue(notation.startswith("(" * 101 + "1 2) 3) 4)"))
+        self.assertEqual(self.recursive_links.parse_links_notation(notation), nested)
 
     def test_to_links_notation_with_refs_simple(self):
         """Test converting nested dict with refs to Links notation"""
@@ -140,6 +180,14 @@ class TestRecursiveLinksAPI(unittest.TestCase):
         self.assertIn("1:", notation)
         self.assertIn("2:", notation)
 
+    def test_to_links_notation_with_refs_exact(self):
+        """Test the exact notation produced for nested references"""
+        notation = self.recursive_links.to_links_notation_with_refs({
+            "1": [1, {"2": [5, 6], "3": [7, [8, 9]]}, 4],
+            "5": []
+        })
+        self.assertEqual(notation, "((1: 1 (2: 5 6) (3: 7 (8 9)) 4) (5: ))")
+
     def test_parse_links_notation_simple(self):
         """Test parsing simple Links notation to nested list"""
         result = self.recursive_links.parse_links_notation("((1 2) (3 4))")
@@ -165,6 +213,27 @@ class TestRecursiveLinksAPI(unittest.TestCase):
         result = self.recursive_links.parse_links_notation("(1 2)")
         self.assertIsInstance(result, list)
 
+    def test_parse_links_notation_deeply_nested(self):
+        """Test parsing notation nested more than one level deep"""
+        result = self.recursive_links.parse_links_notation("((1 2) (3 (4 5)))")
+        self.assertEqual(result, [[1, 2], [3, [4, 5]]])
+
+    def test_parse_links_notation_negative_numbers(self):
+        """Test parsing notation with negative numbers and non-numeric tokens"""
+        result = self.recursive_links.parse_links_notation("((-1 2) (3 - x4))")
+        self.assertEqual(result, [[-1, 2], [3]])
+
+    def test_parse_links_notation_cached_result_is_copied(self):
+        """Test that mutating a parsed result does not affect later parses"""
+        clear_notation_cache()
+        result = self.recursive_links.parse_links_notation("((1 2) (3 4))")
+        result[0].append(99)
+
+        self.assertEqual(
+            self.recursive_links.parse_links_notation("((1 2) (3 4))"),
+            [[1, 2], [3, 4]]
+        )
+
     def test_round_trip_conversion_simple(self):
         """Test converting nested list to notation and back"""
         original = [[1, 2], [3, 4]]
@@ -181,6 +250,13 @@ class TestRecursiveLinksAPI(unittest.TestCase):
 
         self.assertEqual(parsed, original)
 
+    def test_notation_methods_without_instance(self):
+        """Test that notation conversion works without a RecursiveLinks instance"""
+        notation = RecursiveLinks.to_links_notation([[1, 2], [3, 4]])
+        self.assertEqual(notation, "((1 2) (3 4))")
+        self.assertEqual(RecursiveLinks.parse_links_notation(notation), [[1, 2], [3, 4]])
+        self.assertIn("1:", RecursiveLinks.to_links_notation_with_refs({"1": [1, 2]}))
+
     def test_get_underlying_ilinks(self):
         """Test accessing underlying ILinks instance"""
         links = self.recursive_links.get_links()